@@ -1,9 +1,13 @@
+import json
 import os
 import subprocess
+import sys
+import tempfile
 
 from argparse import ArgumentParser
 
 from unreal import unreal_utils as uu
+import scheduler
 
 # import skeleton and process in maya
 # export skeleton to unreal
@@ -15,14 +19,127 @@ PATH_MAYAPY="C:\\Program Files\\Autodesk\\Maya2025\\bin\\mayapy.exe"
 PATH_UNREAL="E:\\UE_5.3\\Engine\\Binaries\\Win64\\UnrealEditor.exe"
 PROJECT_PATH="E:\\UnrealProjects\\MyProject\\MyProject.uproject"
 
+def shard_clips(files: list, n_shards: int, cost=os.path.getsize) -> list:
+    """ Splits files in n_shards lists of similar total cost, biggest clips are placed first. """
+    n_shards = max(min(n_shards, len(files)), 1)
+    shards, loads = [[] for _ in range(n_shards)], [0]*n_shards
+    for f in sorted(files, key=cost, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(f)
+        loads[i] += cost(f)
+    return [sorted(shard) for shard in shards]
+
+def check_shard_conflicts(shards: list, skeleton_asset: str) -> dict:
+    """ Every clip must import to its own package, otherwise two editors would write the same file.
+    Returns {asset name: clip}. """
+    basename = uu.skeleton_basename(skeleton_asset)
+    assets, owners = {}, {}
+    for i, shard in enumerate(shards):
+        for f in shard:
+            asset_name = uu.sanitize_object_name(uu.format_asset_name(os.path.basename(f), 'Animation', basename))
+            # package names are case insensitive
+            if asset_name.lower() in owners:
+                other, other_shard = owners[asset_name.lower()]
+                raise ValueError(f"{f} (shard {i}) and {other} (shard {other_shard}) both import to {asset_name}")
+            assets[asset_name], owners[asset_name.lower()] = f, (f, i)
+    return assets
+
+def find_missing_assets(expected: list, found: list) -> list:
+    found = set(a.lower() for a in found)
+    return sorted(a for a in expected if a.lower() not in found)
+
+def import_animations_sharded(
+    path_unreal_editor: str, unreal_project: str,
+    anims_folder: str, package_path: str, skeleton_path: str,
+    n_shards: int, deferred_save: bool = False
+) -> None:
+    """ Imports the clips in anims_folder with n_shards editor processes running side by side. The
+    skeleton must already have every bone/curve, the run fails if any shard had to modify it. """
+    files = [os.path.join(anims_folder, f) for f in sorted(os.listdir(anims_folder)) if f.endswith('.fbx')]
+    if len(files) == 0:
+        print(f'\tno clips in {anims_folder}')
+        return
+    shards = shard_clips(files, n_shards)
+    expected = check_shard_conflicts(shards, skeleton_path)
+
+    # shard lists and results are only needed for this run, nothing is left in the clip folder
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        procs, result_files = [], []
+        for i, shard in enumerate(shards):
+            clips_file = os.path.join(tmp_dir, f'shard_{i}.txt')
+            with open(clips_file, 'w') as f:
+                f.write('\n'.join(os.path.basename(c) for c in shard))
+
+            result_files.append(os.path.join(tmp_dir, f'shard_{i}.json'))
+            ue_script_arg = f'{os.path.abspath(os.path.join("unreal", "import_animations.py"))} {anims_folder} {package_path} {skeleton_path} --clips {clips_file} --result_file {result_files[i]}'
+            if deferred_save:
+                ue_script_arg += f' --deferred_save --state_file {os.path.join(anims_folder, f".import_state_{i}.json")}'
+
+            print(f'\tstarting shard {i} with {len(shard)} clips')
+            procs.append(subprocess.Popen([path_unreal_editor, unreal_project, '-run=pythonscript', f'-Script={ue_script_arg}']))
+
+        # a script exception doesn't always make the editor exit non zero, only the result file proves the shard finished
+        exit_codes = [proc.wait() for proc in procs]
+        failed = [i for i, code in enumerate(exit_codes) if code != 0 or not os.path.isfile(result_files[i])]
+        if len(failed) > 0:
+            raise RuntimeError(f"animation import shards {failed} failed")
+
+        modified = []
+        for i, result_file in enumerate(result_files):
+            with open(result_file, 'r') as f:
+                if json.load(f)['skeleton_modified']:
+                    modified.append(i)
+        if len(modified) > 0:
+            raise RuntimeError(f"animation import shards {modified} modified {skeleton_path}, import the clips adding bones or curves with a single shard first")
+
+        print('\tmerging shards')
+        found_file = os.path.join(tmp_dir, 'imported_assets.json')
+        ue_script_arg = f'{os.path.abspath(os.path.join("unreal", "rescan_assets.py"))} {package_path} {found_file}'
+        proc = subprocess.run([path_unreal_editor, unreal_project, '-run=pythonscript', f'-Script={ue_script_arg}'])
+        proc.check_returncode()
+
+        # the pythonscript commandlet can exit 0 after a script exception, only the file proves the rescan ran
+        if not os.path.isfile(found_file):
+            raise RuntimeError(f"asset rescan of {package_path} didn't write its results")
+        with open(found_file, 'r') as f:
+            found = json.load(f)
+
+    missing = find_missing_assets(list(expected), found)
+    if len(missing) > 0:
+        raise RuntimeError(f"missing animations after import: {missing}")
+
+
 def run(
     path_mayapy: str, path_unreal_editor: str,
     source_folder: str, maya_processed_folder: str, 
-    unreal_project: str, unreal_package_path: str
+    unreal_project: str, unreal_package_path: str,
+    export_profile: str = 'baked', resample_rates: list = (12,), engine: str = 'maya',
+    deferred_save: bool = False, shards: int = 1, schedule: bool = False, jobs: int = 1
 ):
-    print('running maya batch job')
-    proc = subprocess.run([path_mayapy, os.path.join('maya', 'batch_process_mixamo.py'), source_folder, maya_processed_folder])
-    proc.check_returncode()
+    resample_arg = ','.join(map(str, resample_rates))
+    if engine == 'python':
+        print('running standalone batch job')
+        cmd = [
+            sys.executable, os.path.join('standalone', 'batch_process_mixamo.py'), source_folder, maya_processed_folder,
+            '--resample', resample_arg
+        ]
+    else:
+        print('running maya batch job')
+        cmd = [
+            path_mayapy, os.path.join('maya', 'batch_process_mixamo.py'), source_folder, maya_processed_folder,
+            '--profile', export_profile, '--resample', resample_arg
+        ]
+
+    if schedule:
+        if engine == 'python':
+            # scheduled jobs run in parallel already, each one processes a single clip
+            cmd += ['--jobs', '1']
+        history_file = os.path.join(maya_processed_folder, '.schedule_history.json')
+        os.makedirs(maya_processed_folder, exist_ok=True)
+        scheduler.schedule_batch(cmd, source_folder, jobs, history_file, engine=engine)
+    else:
+        proc = subprocess.run(cmd)
+        proc.check_returncode()
 
     mesh_dir = os.path.join(maya_processed_folder, "Mesh")
     mesh_file = os.path.join(mesh_dir, [f for f in os.listdir(mesh_dir) if f.endswith('.fbx')][0])
@@ -32,14 +149,22 @@ def run(
     proc = subprocess.run([path_unreal_editor, unreal_project, '-run=pythonscript', f'-Script={ue_script_arg}'])
     proc.check_returncode()
 
-    print('running ue animation import job')
     basename = uu.remove_file_ext(os.path.basename(mesh_file))
     skeleton_path = os.path.join(unreal_package_path, uu.format_asset_name(basename, 'Skeleton', basename))
-    maya_anims_processed_folder = os.path.join(maya_processed_folder, 'Anims')
-    unreal_package_path = os.path.join(unreal_package_path, 'Anims')
-    ue_script_arg = f'{os.path.abspath(os.path.join("unreal", "import_animations.py"))} {maya_anims_processed_folder} {unreal_package_path} {skeleton_path}'
-    proc = subprocess.run([path_unreal_editor, unreal_project, '-run=pythonscript', f'-Script={ue_script_arg}'])
-    proc.check_returncode()
+    for n in resample_rates:
+        anims_folder = uu.resample_variant_name('Anims', n, resample_rates)
+        print(f'running ue animation import job for {anims_folder}')
+        maya_anims_processed_folder = os.path.join(maya_processed_folder, anims_folder)
+        unreal_anims_package_path = os.path.join(unreal_package_path, anims_folder)
+        if shards > 1:
+            import_animations_sharded(path_unreal_editor, unreal_project, maya_anims_processed_folder, unreal_anims_package_path, skeleton_path, shards, deferred_save)
+            continue
+
+        ue_script_arg = f'{os.path.abspath(os.path.join("unreal", "import_animations.py"))} {maya_anims_processed_folder} {unreal_anims_package_path} {skeleton_path}'
+        if deferred_save:
+            ue_script_arg += ' --deferred_save'
+        proc = subprocess.run([path_unreal_editor, unreal_project, '-run=pythonscript', f'-Script={ue_script_arg}'])
+        proc.check_returncode()
 
 
 if __name__ == "__main__":
@@ -47,10 +172,17 @@ if __name__ == "__main__":
     parser.add_argument("source_folder", help="Folder containing .fbx files to be processed by Maya.")
     parser.add_argument("unreal_project", help="Unreal project path")
     parser.add_argument("unreal_package_path", help="Target unreal package path.")
+    parser.add_argument("--resample", type=uu.parse_resample_rates, default=[12], help="Comma separated frames per key rates, one animation variant per rate.")
+    parser.add_argument("--export_profile", choices=['sparse', 'baked', 'ascii-debug'], default='baked', help="FBX export profile used by Maya.")
+    parser.add_argument("--deferred_save", action='store_true', help="Save imported animations in one pass after every clip is imported.")
+    parser.add_argument("--shards", type=int, default=1, help="Number of editor processes importing animations in parallel.")
+    parser.add_argument("--schedule", action='store_true', help="Process each clip in its own job, longest first, with a timeout scaled to its predicted cost.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of clip jobs running at once with --schedule.")
+    parser.add_argument("--engine", choices=['maya', 'python'], default='maya', help="Process fbx files with mayapy or the standalone python pipeline.")
 
     args = parser.parse_args()
 
     processed_folder = f'{args.source_folder}_Processed'
-    run(PATH_MAYAPY, PATH_UNREAL, args.source_folder, processed_folder, args.unreal_project, args.unreal_package_path)
+    run(PATH_MAYAPY, PATH_UNREAL, args.source_folder, processed_folder, args.unreal_project, args.unreal_package_path, args.export_profile, args.resample, args.engine, args.deferred_save, args.shards, args.schedule, args.jobs)
 
 
@@ -3,15 +3,36 @@ Batch processes mixamo animations in directory.
 """
 from argparse import ArgumentParser
 import os
+import sys
 
 from maya.standalone import initialize
 import maya.cmds as cmds
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unreal'))
+import unreal_utils as uu
+
 use_newMayaAPI = True
 
 os.environ['MAYA_PLUG_IN_PATH'] = f'D:\\Code\\maya-api\\maya\\plugins;{os.environ.get("MAYA_PLUG_IN_PATH")}' 
 
-def batch_process(source: str, target: str, resample:int) -> None:
+# profile name -> FBX export settings
+#   bake_complex: FBXExportBakeComplexAnimation, what every export used before profiles existed
+#   bake_driven:  bake only channels driven by constraints/expressions before export
+#   ascii:        write a human readable fbx
+EXPORT_PROFILES = {
+    'sparse':      dict(bake_complex=False, bake_driven=True,  ascii=False),
+    'baked':       dict(bake_complex=True,  bake_driven=False, ascii=False),
+    'ascii-debug': dict(bake_complex=False, bake_driven=True,  ascii=True),
+}
+
+# node types whose outputs won't survive an fbx export unless baked to keys
+DRIVER_NODE_TYPES = ['constraint', 'expression']
+
+# a channel that is keyed and constrained at once reaches the joint through a pairBlend
+BLEND_NODE_TYPES = ['pairBlend']
+
+
+def initialize_maya() -> None:
     initialize("python")
     initialize("mel")
     cmds.loadPlugin("fbxmaya")
@@ -19,6 +40,35 @@ def batch_process(source: str, target: str, resample:int) -> None:
     cmds.loadPlugin("resample_anim_curves.py")
 
 
+def snapshot_anim_curves() -> dict:
+    """ Duplicates the joint anim curves so the imported keys can be restored after resampling. """
+    snapshot = {}
+    for joint in cmds.ls(type='joint'):
+        connections = cmds.listConnections(joint, source=True, destination=False, plugs=True, connections=True, type='animCurve') or []
+        for plug, curve_plug in zip(connections[::2], connections[1::2]):
+            curve = curve_plug.split('.')[0]
+            snapshot[plug] = cmds.duplicate(curve, name=f'{curve}_snapshot')[0]
+    return snapshot
+
+def restore_anim_curves(snapshot: dict) -> None:
+    """ Connects a fresh copy of each snapshot curve in place of the resampled one, the keys keep
+    the snapshot's own times whatever the current time is. """
+    for plug, curve in snapshot.items():
+        resampled = cmds.listConnections(plug, source=True, destination=False, type='animCurve') or []
+        cmds.connectAttr(cmds.duplicate(curve)[0] + '.output', plug, force=True)
+        if len(resampled) > 0:
+            cmds.delete(resampled)
+
+
+def batch_process(source: str, target: str, resample: list, profile: str = 'baked', clips: list = None, process_mesh: bool = True) -> None:
+    assert profile in EXPORT_PROFILES, f"unknown export profile {profile}, expected one of {list(EXPORT_PROFILES)}"
+    initialize_maya()
+
+    if process_mesh:
+        batch_process_mesh(source, target, profile)
+    batch_process_animations(source, target, resample, profile, clips)
+
+def batch_process_mesh(source: str, target: str, profile: str = 'baked') -> None:
     mesh_dir = os.path.join(source, 'Mesh')
     assert os.path.isdir(mesh_dir), "needs a folder called Mesh in source dir"
 
@@ -36,14 +86,18 @@ def batch_process(source: str, target: str, resample:int) -> None:
     cmds.mixamo_rename()
 
 
-    export(target_mesh_path)
+    export(target_mesh_path, profile)
     cmds.file(f=True, new=True)
 
-    target_anim_folder = os.path.join(target, 'Anims')
-    os.makedirs(target_anim_folder, exist_ok=True)
+def batch_process_animations(source: str, target: str, resample: list, profile: str = 'baked', clips: list = None) -> None:
+    # bakes from the export profile stay on the curves, so go from the densest rate up
+    rates = sorted(set(resample))
+    target_anim_folders = {n: os.path.join(target, uu.resample_variant_name('Anims', n, rates)) for n in rates}
+    for folder in target_anim_folders.values():
+        os.makedirs(folder, exist_ok=True)
 
     anim_src_dir = os.path.join(source, 'Anims')
-    files = [os.path.join(anim_src_dir,f) for f in os.listdir(anim_src_dir) if f.endswith('.fbx')]
+    files = [os.path.join(anim_src_dir,f) for f in os.listdir(anim_src_dir) if f.endswith('.fbx') and (clips is None or f in clips)]
     for file in files:
         print(f'[+] processing animation: {file}...')
 
@@ -54,23 +108,69 @@ def batch_process(source: str, target: str, resample:int) -> None:
         print('\tprocessing rig')
         cmds.mixamo_rename()
 
-        print('\tresampling anim curves')
-        cmds.resample_anim_curves_all(n=resample)
+        # taken before the first export, whose profile may bake keys onto the curves
+        snapshot = snapshot_anim_curves() if len(rates) > 1 else {}
+        for i, n in enumerate(rates):
+            if i > 0:
+                print('\trestoring anim curves')
+                restore_anim_curves(snapshot)
 
-        target_anim_path = os.path.join(target_anim_folder, os.path.basename(file))
-        print(f'\texporting to {target}')
+            print(f'\tresampling anim curves at {n} frames per key')
+            cmds.resample_anim_curves_all(n=n)
 
-        export(target_anim_path)
+            target_anim_path = os.path.join(target_anim_folders[n], uu.resample_variant_name(os.path.basename(file), n, rates))
+            print(f'\texporting to {target_anim_path}')
+
+            export(target_anim_path, profile, n)
 
         cmds.file(f=True, new=True)
 
-import maya.cmds as cmds
-def export(target: str):
+def get_driver_nodes(node: str) -> list:
+    """ node itself, or the nodes feeding it when it only blends its inputs. unitConversion
+    nodes (expressions driving rotations) are skipped by listConnections. """
+    if not any(cmds.objectType(node, isa=t) for t in BLEND_NODE_TYPES):
+        return [node]
+    inputs = cmds.listConnections(node, source=True, destination=False, skipConversionNodes=True) or []
+    return [driver for n in set(inputs) for driver in get_driver_nodes(n)]
+
+def get_driven_plugs() -> list:
+    """ Joint plugs whose values come from constraints or expressions instead of anim curves. """
+    plugs = []
+    for joint in cmds.ls(type='joint'):
+        connections = cmds.listConnections(
+            joint, source=True, destination=False, plugs=True, connections=True, skipConversionNodes=True
+        ) or []
+        for plug, driver in zip(connections[::2], connections[1::2]):
+            drivers = get_driver_nodes(driver.split('.')[0])
+            if any(cmds.objectType(d, isa=t) for d in drivers for t in DRIVER_NODE_TYPES):
+                plugs.append(plug)
+    return plugs
+
+def bake_driven_channels(sample_by: int = 1) -> None:
+    plugs = get_driven_plugs()
+    if len(plugs) == 0:
+        return
+
+    print(f'\tbaking {len(plugs)} driven channels every {sample_by} frames')
+    min_frame = cmds.playbackOptions(query=True, ast=True)
+    max_frame = cmds.playbackOptions(query=True, aet=True)
+    cmds.bakeResults(plugs, time=(min_frame, max_frame), sampleBy=sample_by, simulation=True, preserveOutsideKeys=False)
+
+def export(target: str, profile: str = 'baked', sample_by: int = 1):
+    options = EXPORT_PROFILES[profile]
+    if options['bake_driven']:
+        bake_driven_channels(sample_by)
+
     cmds.FBXResetExport()
     cmds.FBXExportConvertUnitString('cm')
     cmds.FBXExportFileVersion('FBX201800')
     cmds.FBXExportSmoothMesh('-v', False)
-    cmds.FBXExportBakeComplexAnimation('-v', True)
+    cmds.FBXExportBakeComplexAnimation('-v', options['bake_complex'])
+    if not options['bake_complex']:
+        # write the curves' own euler keys, baked keeps the exporter defaults it always used
+        cmds.FBXExportApplyConstantKeyReducer('-v', False)
+        cmds.FBXExportQuaternion('-v', 'euler')
+    cmds.FBXExportInAscii('-v', options['ascii'])
     cmds.FBXExportUseSceneName('-v', False)
     cmds.FBXExportUpAxis('z')
     cmds.FBXExportCameras('-v', False)
@@ -81,7 +181,10 @@ if __name__ == "__main__":
     parser = ArgumentParser()
     parser.add_argument("source", help="Source folder to read animations from.")
     parser.add_argument("target", help="Target folder to save animations to.")
-    parser.add_argument("--resample", type=int, default=12, help="Resamples animations at n frames per key.")
+    parser.add_argument("--resample", type=uu.parse_resample_rates, default=[12], help="Resamples animations at n frames per key. Comma separated rates (1,4,12) export one variant per rate.")
+    parser.add_argument("--profile", choices=list(EXPORT_PROFILES), default='baked', help="FBX export profile.")
+    parser.add_argument("--clips", nargs='*', default=None, help="Animation file names to process, all when omitted and none when empty.")
+    parser.add_argument("--no_mesh", action='store_true', help="Skip processing the mesh.")
     args = parser.parse_args()
 
-    batch_process(args.source, args.target, args.resample)
+    batch_process(args.source, args.target, args.resample, args.profile, args.clips, not args.no_mesh)
@@ -0,0 +1,91 @@
+"""
+Compares file size and key count of the fbx export profiles on a folder of mixamo animations.
+
+    mayapy maya/benchmark_export_profiles.py 00_AnimsRaw --resample 12
+
+Joint curve keys and sizes of the 00_AnimsRaw sample clips, counted from the files on disk.
+baked is 00_AnimsRaw_Processed, written by the export settings the baked profile keeps
+(FBXExportBakeComplexAnimation on).
+
+    clip                    output        size (KB)    keys
+    Zombie Attack.fbx       raw               460.5   10089
+    Zombie Attack.fbx       baked R12         266.7    1080
+    Zombie Crawl.fbx        raw               610.9   21462
+    Zombie Crawl.fbx        baked R12         295.2    1890
+    Zombie Idle.fbx         raw               556.7   12213
+    Zombie Idle.fbx         baked R12         277.6    2295
+    Zombie Scream.fbx       raw               484.4   11475
+    Zombie Scream.fbx       baked R12         266.7    1080
+    Zombie Walking.fbx      raw               506.6    8484
+    Zombie Walking.fbx      baked R12         285.7    1620
+    total                   raw              2619.2   63723
+    total                   baked R12        1392.0    7965
+
+The baked export keeps exactly the resampled keys on these clips, they have no constraints or
+expressions for the bake to expand. No sparse or ascii-debug rows have been recorded yet, sparse
+stays opt-in until a mayapy run of this script shows it is no larger than baked.
+"""
+from argparse import ArgumentParser
+import os
+import tempfile
+
+import maya.cmds as cmds
+
+from batch_process_mixamo import EXPORT_PROFILES, initialize_maya, export
+
+
+def count_keys() -> int:
+    return sum(cmds.keyframe(joint, query=True, keyframeCount=True) or 0 for joint in cmds.ls(type='joint'))
+
+def import_fbx(file: str) -> None:
+    cmds.currentUnit(t='ntsc')
+    cmds.file(file, i=True, type='Fbx', itr='override')
+
+def measure(file: str) -> tuple:
+    cmds.file(f=True, new=True)
+    import_fbx(file)
+    keys = count_keys()
+    cmds.file(f=True, new=True)
+    return os.path.getsize(file), keys
+
+def benchmark(source: str, resample: int, profiles: list) -> list:
+    anim_src_dir = os.path.join(source, 'Anims')
+    files = [os.path.join(anim_src_dir, f) for f in sorted(os.listdir(anim_src_dir)) if f.endswith('.fbx')]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file in files:
+            rows.append((os.path.basename(file), 'raw', *measure(file)))
+
+            for profile in profiles:
+                target = os.path.join(tmp_dir, profile, os.path.basename(file))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+
+                import_fbx(file)
+                cmds.mixamo_rename()
+                cmds.resample_anim_curves_all(n=resample)
+                export(target, profile, resample)
+
+                rows.append((os.path.basename(file), profile, *measure(target)))
+    return rows
+
+def print_report(rows: list) -> None:
+    print(f'{"clip":<24}{"profile":<14}{"size (KB)":>12}{"keys":>10}')
+    for clip, profile, size, keys in rows:
+        print(f'{clip:<24}{profile:<14}{size/1024:>12.1f}{keys:>10}')
+
+    print()
+    for profile in ['raw', *dict.fromkeys(r[1] for r in rows if r[1] != 'raw')]:
+        sizes, keys = zip(*[(r[2], r[3]) for r in rows if r[1] == profile])
+        print(f'{"total":<24}{profile:<14}{sum(sizes)/1024:>12.1f}{sum(keys):>10}')
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("source", help="Source folder with an Anims folder to benchmark.")
+    parser.add_argument("--resample", type=int, default=12, help="Resamples animations at n frames per key.")
+    parser.add_argument("--profiles", nargs='+', choices=list(EXPORT_PROFILES), default=list(EXPORT_PROFILES))
+    args = parser.parse_args()
+
+    initialize_maya()
+    print_report(benchmark(args.source, args.resample, args.profiles))
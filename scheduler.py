@@ -0,0 +1,208 @@
+"""
+Runs the per clip batch jobs longest first with a time budget scaled to each clip's
+predicted cost. Jobs that blow their budget are killed and retried one at a time, and
+predicted/actual durations are kept in a history file the cost model is fitted on.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import json
+import os
+import subprocess
+import time
+from typing import Callable
+
+from standalone import fbx_binary as fb
+
+# reading a clip's skeleton/frame count means parsing it, skip that for big files
+MAX_INSPECT_BYTES = 32 * 1024 * 1024
+
+# rough size of one joint-frame in a mixamo fbx, used when a clip can't be inspected
+BYTES_PER_WORK_UNIT = 100.0
+
+MESH_JOB = 'mesh'
+CLIP_JOB = 'clip'
+
+
+class ClipInfo:
+    def __init__(self, path: str, size: int, frames: int = None, joints: int = None):
+        self.path = path
+        self.size = size
+        self.frames = frames
+        self.joints = joints
+
+    def work(self) -> float:
+        if self.frames is not None and self.joints is not None:
+            return float(self.frames * self.joints)
+        return self.size / BYTES_PER_WORK_UNIT
+
+
+def read_clip_info(path: str, fps: int = 30) -> ClipInfo:
+    size = os.path.getsize(path)
+    if size > MAX_INSPECT_BYTES:
+        return ClipInfo(path, size)
+
+    try:
+        doc = fb.read(path)
+    except (ValueError, OSError):
+        return ClipInfo(path, size)
+
+    objects = doc.find('Objects')
+    joints = [o for o in objects.find_all('Model') if o.properties[2][1] == b'LimbNode']
+
+    frames = 0
+    stack = objects.find('AnimationStack')
+    for p in stack.find('Properties70').children if stack is not None else []:
+        if p.properties[0][1] == b'LocalStop':
+            frames = int(p.properties[4][1] / (fb.KTIME_SECOND // fps))
+    # meshes without animation fall back to their size
+    if frames == 0 or len(joints) == 0:
+        return ClipInfo(path, size)
+    return ClipInfo(path, size, frames, len(joints))
+
+
+class CostModel:
+    """ seconds = overhead + seconds_per_unit * work """
+
+    def __init__(self, overhead: float = 5.0, seconds_per_unit: float = 0.005):
+        self.overhead = overhead
+        self.seconds_per_unit = seconds_per_unit
+
+    def predict(self, info: ClipInfo) -> float: return self.overhead + self.seconds_per_unit * info.work()
+
+    def calibrate(self, history: list) -> None:
+        """ Least squares fit of overhead and seconds_per_unit over finished jobs. """
+        samples = [(r['work'], r['actual']) for r in history if r.get('status') == 'done']
+        if len(samples) < 2:
+            return
+
+        n = len(samples)
+        mean_work = sum(w for w, _ in samples) / n
+        mean_actual = sum(a for _, a in samples) / n
+        variance = sum((w - mean_work)**2 for w, _ in samples)
+        if variance == 0:
+            return
+
+        slope = sum((w - mean_work)*(a - mean_actual) for w, a in samples) / variance
+        self.seconds_per_unit = max(slope, 0.0)
+        self.overhead = max(mean_actual - self.seconds_per_unit * mean_work, 0.0)
+
+
+def fit_cost_model(history: list, engine: str, kind: str) -> CostModel:
+    """ mayapy startup dwarfs a standalone run and meshes are measured in bytes rather than
+    joint-frames, so only records of the same engine and job kind are fitted together. """
+    model = CostModel()
+    model.calibrate([r for r in history if r.get('engine') == engine and r.get('kind') == kind])
+    return model
+
+
+def load_history(path: str) -> list:
+    if path is None or not os.path.isfile(path):
+        return []
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_history(path: str, history: list, max_records: int = 1000) -> None:
+    with open(path, 'w') as f:
+        json.dump(history[-max_records:], f, indent=2)
+
+
+class Job:
+    def __init__(self, name: str, cmd: list, predicted: float, budget: float, work: float = 0.0, kind: str = CLIP_JOB):
+        self.name = name
+        self.cmd = cmd
+        self.predicted = predicted
+        self.budget = budget
+        self.work = work
+        self.kind = kind
+
+    def __repr__(self): return f'Job({self.name}, predicted={self.predicted:.1f}s, budget={self.budget:.1f}s)'
+
+
+def make_job(
+    name: str, cmd: list, info: ClipInfo, model: CostModel, timeout_factor: float = 4.0, min_timeout: float = 60.0,
+    kind: str = CLIP_JOB
+) -> Job:
+    predicted = model.predict(info)
+    return Job(name, cmd, predicted, max(predicted * timeout_factor, min_timeout), info.work(), kind)
+
+def order_longest_first(jobs: list) -> list: return sorted(jobs, key=lambda j: j.predicted, reverse=True)
+
+def simulate_makespan(durations: list, n_workers: int) -> float:
+    """ Finish time of running durations in order, each one on the first worker to free up. """
+    workers = [0.0] * max(n_workers, 1)
+    for d in durations:
+        heapq.heapreplace(workers, workers[0] + d)
+    return max(workers)
+
+
+def run_subprocess(job: Job, timeout: float) -> None:
+    """ subprocess.run kills the job when the timeout expires. """
+    subprocess.run(job.cmd, timeout=timeout).check_returncode()
+
+
+def run_jobs(
+    jobs: list, n_workers: int = 1, run_job: Callable[[Job, float], None] = run_subprocess,
+    retry_factor: float = 2.0
+) -> list:
+    """ Runs jobs longest first. Jobs that time out are retried alone with retry_factor times
+    their budget once the rest are done. Returns history records. """
+
+    def timed(job: Job, timeout: float) -> dict:
+        start = time.perf_counter()
+        try:
+            run_job(job, timeout)
+            status = 'done'
+        except subprocess.TimeoutExpired:
+            status = 'timeout'
+        except (subprocess.CalledProcessError, OSError) as e:
+            # a bad interpreter path fails to spawn, keep it in the history like any other failure
+            print(f'[!] {job.name} failed: {e}')
+            status = 'failed'
+        return {
+            'name': job.name, 'kind': job.kind, 'work': job.work, 'predicted': job.predicted, 'budget': timeout,
+            'actual': time.perf_counter() - start, 'status': status
+        }
+
+    with ThreadPoolExecutor(max_workers=max(n_workers, 1)) as pool:
+        records = list(pool.map(lambda j: timed(j, j.budget), order_longest_first(jobs)))
+
+    by_name = {j.name: j for j in jobs}
+    for record in [r for r in records if r['status'] == 'timeout']:
+        job = by_name[record['name']]
+        print(f'[!] {job.name} took longer than {job.budget:.0f}s, retrying on its own')
+        records.append(timed(job, job.budget * retry_factor))
+
+    return records
+
+
+def schedule_batch(
+    cmd: list, source_folder: str, n_workers: int = 1, history_file: str = None,
+    run_job: Callable[[Job, float], None] = run_subprocess, engine: str = 'maya'
+) -> list:
+    """ Splits a batch_process_mixamo.py command into one job for the mesh and one per clip. """
+    history = load_history(history_file)
+    mesh_model, clip_model = fit_cost_model(history, engine, MESH_JOB), fit_cost_model(history, engine, CLIP_JOB)
+
+    mesh_dir = os.path.join(source_folder, 'Mesh')
+    mesh_files = [os.path.join(mesh_dir, f) for f in os.listdir(mesh_dir) if f.endswith('.fbx')]
+    jobs = [
+        make_job(f'Mesh/{os.path.basename(f)}', cmd + ['--clips'], read_clip_info(f), mesh_model, kind=MESH_JOB)
+        for f in mesh_files
+    ]
+
+    anim_src_dir = os.path.join(source_folder, 'Anims')
+    for f in sorted(os.listdir(anim_src_dir)):
+        if f.endswith('.fbx'):
+            jobs.append(make_job(f, cmd + ['--no_mesh', '--clips', f], read_clip_info(os.path.join(anim_src_dir, f)), clip_model))
+
+    records = run_jobs(jobs, n_workers, run_job)
+    for record in records:
+        record['engine'] = engine
+    if history_file is not None:
+        save_history(history_file, history + records)
+
+    last_status = {r['name']: r['status'] for r in records}
+    failed = sorted(name for name, status in last_status.items() if status != 'done')
+    if len(failed) > 0:
+        raise RuntimeError(f"batch jobs failed: {failed}")
+    return records
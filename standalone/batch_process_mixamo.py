@@ -0,0 +1,65 @@
+"""
+Batch processes mixamo animations in directory without maya. Same folder layout and
+arguments as maya/batch_process_mixamo.py, clips are processed in a process pool.
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'unreal'))
+
+import process_mixamo as pm
+import unreal_utils as uu
+
+
+def batch_process(source: str, target: str, resample: list, jobs: int = None, clips: list = None, process_mesh: bool = True) -> None:
+    mesh_dir = os.path.join(source, 'Mesh')
+    assert os.path.isdir(mesh_dir), "needs a folder called Mesh in source dir"
+
+    mesh_files = [f for f in os.listdir(mesh_dir) if f.endswith('.fbx')]
+    assert len(mesh_files) == 1, "only one mesh file allowed in mesh file"
+
+    mesh_file = os.path.join(mesh_dir, mesh_files[0])
+    target_mesh_path = os.path.join(target, 'Mesh', os.path.basename(mesh_file))
+    os.makedirs(os.path.dirname(target_mesh_path), exist_ok=True)
+
+    rates = sorted(set(resample))
+    target_anim_folders = {n: os.path.join(target, uu.resample_variant_name('Anims', n, rates)) for n in rates}
+    for folder in target_anim_folders.values():
+        os.makedirs(folder, exist_ok=True)
+
+    anim_src_dir = os.path.join(source, 'Anims')
+    files = [os.path.join(anim_src_dir,f) for f in os.listdir(anim_src_dir) if f.endswith('.fbx') and (clips is None or f in clips)]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {}
+        if process_mesh:
+            print(f'[+] processing mesh: {mesh_file}')
+            futures[pool.submit(pm.process_mesh, mesh_file, target_mesh_path)] = mesh_file
+
+        for file in files:
+            print(f'[+] processing animation: {file}...')
+            targets = {
+                n: os.path.join(target_anim_folders[n], uu.resample_variant_name(os.path.basename(file), n, rates))
+                for n in rates
+            }
+            futures[pool.submit(pm.process_animation, file, targets)] = file
+
+        for future, file in futures.items():
+            future.result()
+            print(f'\tdone: {file}')
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("source", help="Source folder to read animations from.")
+    parser.add_argument("target", help="Target folder to save animations to.")
+    parser.add_argument("--resample", type=uu.parse_resample_rates, default=[12], help="Resamples animations at n frames per key. Comma separated rates (1,4,12) export one variant per rate.")
+    parser.add_argument("--jobs", type=int, default=None, help="Number of worker processes, defaults to the cpu count.")
+    parser.add_argument("--clips", nargs='*', default=None, help="Animation file names to process, all when omitted and none when empty.")
+    parser.add_argument("--no_mesh", action='store_true', help="Skip processing the mesh.")
+    args = parser.parse_args()
+
+    batch_process(args.source, args.target, args.resample, args.jobs, args.clips, not args.no_mesh)
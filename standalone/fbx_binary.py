@@ -0,0 +1,167 @@
+"""
+Minimal binary FBX reader/writer. Every node is kept as read, so anything the pipeline
+doesn't touch is written back unchanged.
+"""
+import struct
+import zlib
+
+HEADER_MAGIC = b'Kaydara FBX Binary  \x00\x1a\x00'
+FOOTER_MAGIC = b'\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b'
+
+# fbx time units in one second
+KTIME_SECOND = 46186158000
+
+SCALAR_FORMATS = {'Y': '<h', 'C': '<?', 'I': '<i', 'F': '<f', 'D': '<d', 'L': '<q'}
+ARRAY_FORMATS = {'f': 'f', 'd': 'd', 'l': 'q', 'i': 'i', 'b': '?'}
+
+# nodes that always end with a null record, even when they have properties and no children
+ALWAYS_BLOCK_SENTINEL = ['AnimationStack', 'AnimationLayer']
+
+
+class FBXNode:
+    def __init__(self, name: str, properties: list = None, children: list = None):
+        self.name = name
+        self.properties = properties if properties is not None else [] # (type code, value)
+        self.children = children if children is not None else []
+
+    def __repr__(self): return f'FBXNode({self.name}, {len(self.properties)} properties, {len(self.children)} children)'
+
+    def values(self) -> list: return [v for _, v in self.properties]
+    def find(self, name: str): return next(iter(self.find_all(name)), None)
+    def find_all(self, name: str) -> list: return [c for c in self.children if c.name == name]
+
+
+class FBXDocument:
+    def __init__(self, version: int, nodes: list, footer_id: bytes):
+        self.version = version
+        self.nodes = nodes
+        self.footer_id = footer_id
+
+    def find(self, name: str): return next(iter(n for n in self.nodes if n.name == name), None)
+
+
+def _read_property(data: bytes, pos: int) -> tuple:
+    type_code = chr(data[pos])
+    pos += 1
+
+    if type_code in SCALAR_FORMATS:
+        fmt = SCALAR_FORMATS[type_code]
+        return (type_code, struct.unpack_from(fmt, data, pos)[0]), pos + struct.calcsize(fmt)
+
+    if type_code in ARRAY_FORMATS:
+        length, encoding, compressed_length = struct.unpack_from('<III', data, pos)
+        pos += 12
+        raw = data[pos:pos+compressed_length]
+        if encoding == 1:
+            raw = zlib.decompress(raw)
+        return (type_code, list(struct.unpack(f'<{length}{ARRAY_FORMATS[type_code]}', raw))), pos + compressed_length
+
+    if type_code in 'SR':
+        length = struct.unpack_from('<I', data, pos)[0]
+        pos += 4
+        return (type_code, data[pos:pos+length]), pos + length
+
+    raise ValueError(f"unknown fbx property type '{type_code}' at {pos-1}")
+
+
+def _read_node(data: bytes, pos: int, wide: bool) -> tuple:
+    header_fmt = '<QQQ' if wide else '<III'
+    end, n_properties, _ = struct.unpack_from(header_fmt, data, pos)
+    pos += struct.calcsize(header_fmt)
+    name_length = data[pos]
+    name = data[pos+1:pos+1+name_length].decode('ascii')
+    pos += 1 + name_length
+
+    if end == 0:
+        return None, pos
+
+    node = FBXNode(name)
+    for _ in range(n_properties):
+        prop, pos = _read_property(data, pos)
+        node.properties.append(prop)
+
+    while pos < end:
+        child, pos = _read_node(data, pos, wide)
+        if child is None:
+            break
+        node.children.append(child)
+
+    return node, end
+
+
+def read(path: str) -> FBXDocument:
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(HEADER_MAGIC):
+        raise ValueError(f"{path} is not a binary fbx file")
+
+    version = struct.unpack_from('<I', data, len(HEADER_MAGIC))[0]
+    wide = version >= 7500
+
+    nodes, pos = [], len(HEADER_MAGIC) + 4
+    while True:
+        node, pos = _read_node(data, pos, wide)
+        if node is None:
+            break
+        nodes.append(node)
+
+    return FBXDocument(version, nodes, data[pos:pos+16])
+
+
+def _write_property(out: bytearray, type_code: str, value) -> None:
+    out += type_code.encode('ascii')
+
+    if type_code in SCALAR_FORMATS:
+        out += struct.pack(SCALAR_FORMATS[type_code], value)
+    elif type_code in ARRAY_FORMATS:
+        compressed = zlib.compress(struct.pack(f'<{len(value)}{ARRAY_FORMATS[type_code]}', *value))
+        out += struct.pack('<III', len(value), 1, len(compressed))
+        out += compressed
+    elif type_code in 'SR':
+        out += struct.pack('<I', len(value))
+        out += value
+    else:
+        raise ValueError(f"unknown fbx property type '{type_code}'")
+
+
+def _write_node(out: bytearray, node: FBXNode, wide: bool) -> None:
+    header_fmt = '<QQQ' if wide else '<III'
+    null_record = b'\x00' * struct.calcsize(header_fmt) + b'\x00'
+
+    header_pos = len(out)
+    out += b'\x00' * struct.calcsize(header_fmt)
+    name = node.name.encode('ascii')
+    out += bytes([len(name)]) + name
+
+    properties_pos = len(out)
+    for type_code, value in node.properties:
+        _write_property(out, type_code, value)
+    properties_length = len(out) - properties_pos
+
+    for child in node.children:
+        _write_node(out, child, wide)
+    if len(node.children) > 0 or len(node.properties) == 0 or node.name in ALWAYS_BLOCK_SENTINEL:
+        out += null_record
+
+    struct.pack_into(header_fmt, out, header_pos, len(out), len(node.properties), properties_length)
+
+
+def write(path: str, doc: FBXDocument) -> None:
+    wide = doc.version >= 7500
+
+    out = bytearray(HEADER_MAGIC)
+    out += struct.pack('<I', doc.version)
+    for node in doc.nodes:
+        _write_node(out, node, wide)
+    out += b'\x00' * (struct.calcsize('<QQQ' if wide else '<III') + 1)
+
+    out += doc.footer_id
+    padding = (16 - len(out) % 16) or 16
+    out += b'\x00' * (padding + 4)
+    out += struct.pack('<I', doc.version)
+    out += b'\x00' * 120
+    out += FOOTER_MAGIC
+
+    with open(path, 'wb') as f:
+        f.write(out)
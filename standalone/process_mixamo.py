@@ -0,0 +1,243 @@
+"""
+Pure python version of the maya stage: removes the mixamorig: prefix from joints, replaces
+Left/Right prefixes with L_/R_, adds a Root bone to the rig and resamples the joint
+animation curves at a configurable frames per key interval.
+
+Mirrors maya/plugins/preprocess_mixamo_animation.py and maya/plugins/resample_anim_curves.py,
+keep them in sync. The scene keeps its source axis and units, Unreal converts them on import.
+"""
+from bisect import bisect_left
+import copy
+import re
+
+import fbx_binary as fb
+
+PREFFIX_MAPPING = {
+    'Left_?|L(?!_)': 'L_',
+    'Right_?|R(?!_)': 'R_'
+}
+
+NAME_SEPARATOR = b'\x00\x01'
+
+# maya batch runs with currentUnit(t='ntsc')
+DEFAULT_FPS = 30
+
+
+def object_id(node: fb.FBXNode) -> int: return node.properties[0][1]
+def object_name(node: fb.FBXNode) -> str: return node.properties[1][1].split(NAME_SEPARATOR)[0].decode('utf-8')
+def object_class(node: fb.FBXNode) -> bytes: return node.properties[1][1].split(NAME_SEPARATOR)[-1]
+def is_joint(node: fb.FBXNode) -> bool: return node.name == 'Model' and node.properties[2][1] == b'LimbNode'
+
+def set_object_name(node: fb.FBXNode, name: str) -> None:
+    node.properties[1] = ('S', name.encode('utf-8') + NAME_SEPARATOR + object_class(node))
+
+
+def format_joint_name(name: str) -> str:
+    new_name = name.replace('mixamorig:', '')
+    for regex_preffix, new_preffix in PREFFIX_MAPPING.items():
+        m = re.match(regex_preffix, new_name)
+        if m is None:
+            continue
+
+        new_name = new_name.replace(m.group(0), new_preffix)
+    return new_name
+
+
+class MixamoScene:
+    """ Object/connection lookups over an fbx document. """
+
+    def __init__(self, doc: fb.FBXDocument):
+        self.doc = doc
+        self.objects = doc.find('Objects')
+        self.connections = doc.find('Connections')
+
+    def objects_by_id(self) -> dict: return {object_id(o): o for o in self.objects.children}
+    def joints(self) -> list: return [o for o in self.objects.children if is_joint(o)]
+    def links(self) -> list:
+        """ (child id, parent id, property name or None, connection node) """
+        return [
+            (c.properties[1][1], c.properties[2][1], c.properties[3][1].decode('utf-8') if len(c.properties) > 3 else None, c)
+            for c in self.connections.children
+        ]
+
+    def new_id(self) -> int: return max(object_id(o) for o in self.objects.children) + 1
+
+    def parent_ids(self, object_ids: set) -> dict:
+        return {child: parent for child, parent, prop, _ in self.links() if child in object_ids and prop is None}
+
+    def remove_objects(self, object_ids: set) -> None:
+        self.objects.children = [o for o in self.objects.children if object_id(o) not in object_ids]
+        self.connections.children = [
+            c for child, parent, _, c in self.links() if child not in object_ids and parent not in object_ids
+        ]
+
+    def update_definition_counts(self) -> None:
+        definitions = self.doc.find('Definitions')
+        if definitions is None:
+            return
+
+        total = 0
+        for object_type in definitions.find_all('ObjectType'):
+            type_name = object_type.properties[0][1].decode('utf-8')
+            count = object_type.find('Count')
+            n_objects = len(self.objects.find_all(type_name))
+            if n_objects > 0:
+                count.properties = [('I', n_objects)]
+            total += count.properties[0][1]
+        definitions.find('Count').properties = [('I', total)]
+
+
+def rename_joints(scene: MixamoScene) -> dict:
+    renamed = {}
+    for joint in scene.joints():
+        old_name = object_name(joint)
+        new_name = format_joint_name(old_name)
+        set_object_name(joint, new_name)
+        renamed[new_name] = old_name
+    return renamed
+
+
+def add_root_joint(scene: MixamoScene, name: str = 'Root') -> int:
+    joint_ids = [object_id(j) for j in scene.joints()]
+    parents = scene.parent_ids(set(joint_ids))
+    root_id = next(iter(j for j in joint_ids if parents.get(j) == 0), None)
+    if root_id is None:
+        raise ValueError("Couldn't find root bone.")
+
+    objects = scene.objects_by_id()
+    attribute = next(iter(
+        objects[child] for child, parent, prop, _ in scene.links()
+        if parent == root_id and prop is None and child in objects and objects[child].name == 'NodeAttribute'
+    ), None)
+
+    new_root_id = scene.new_id()
+    new_root = fb.FBXNode('Model', [('L', new_root_id), ('S', name.encode('utf-8') + NAME_SEPARATOR + b'Model'), ('S', b'LimbNode')], [
+        fb.FBXNode('Version', [('I', 232)]),
+        fb.FBXNode('Properties70', [], [
+            fb.FBXNode('P', [('S', b'DefaultAttributeIndex'), ('S', b'int'), ('S', b'Integer'), ('S', b''), ('I', 0)])
+        ]),
+        fb.FBXNode('Shading', [('C', True)]),
+        fb.FBXNode('Culling', [('S', b'CullingOff')]),
+    ])
+    scene.objects.children.insert(scene.objects.children.index(objects[root_id]), new_root)
+
+    new_connections = [fb.FBXNode('C', [('S', b'OO'), ('L', new_root_id), ('L', 0)])]
+    if attribute is not None:
+        new_attribute = copy.deepcopy(attribute)
+        new_attribute.properties[0] = ('L', new_root_id + 1)
+        scene.objects.children.insert(scene.objects.children.index(attribute), new_attribute)
+        new_connections.append(fb.FBXNode('C', [('S', b'OO'), ('L', new_root_id + 1), ('L', new_root_id)]))
+
+    for child, parent, prop, connection in scene.links():
+        if child == root_id and parent == 0:
+            connection.properties[2] = ('L', new_root_id)
+            index = scene.connections.children.index(connection)
+            scene.connections.children[index:index] = new_connections
+            break
+
+    for pose in scene.objects.find_all('Pose'):
+        if pose.find('Type').properties[0][1] != b'BindPose':
+            continue
+        pose.children.append(fb.FBXNode('PoseNode', [], [
+            fb.FBXNode('Node', [('L', new_root_id)]),
+            fb.FBXNode('Matrix', [('d', [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0])]),
+        ]))
+        n_pose_nodes = pose.find('NbPoseNodes')
+        n_pose_nodes.properties = [('I', n_pose_nodes.properties[0][1] + 1)]
+
+    scene.update_definition_counts()
+    return new_root_id
+
+
+def remove_unused_curves(scene: MixamoScene) -> None:
+    """ Mixamo files carry curves that drive nothing, maya drops them on export. """
+    objects = scene.objects_by_id()
+    kinds = {i: o.name for i, o in objects.items()}
+    driving_nodes = {
+        child for child, parent, prop, _ in scene.links()
+        if kinds.get(child) == 'AnimationCurveNode' and parent in objects and prop is not None
+    }
+    driving_curves = {child for child, parent, _, _ in scene.links() if kinds.get(child) == 'AnimationCurve' and parent in driving_nodes}
+
+    unused = {
+        i for i, o in objects.items()
+        if (o.name == 'AnimationCurveNode' and i not in driving_nodes) or (o.name == 'AnimationCurve' and i not in driving_curves)
+    }
+    scene.remove_objects(unused)
+    scene.update_definition_counts()
+
+
+def get_time_range(scene: MixamoScene, frame_time: int) -> tuple:
+    stack = scene.objects.find('AnimationStack')
+    times = {'LocalStart': 0, 'LocalStop': 0}
+    for p in stack.find('Properties70').children if stack is not None else []:
+        key = p.properties[0][1].decode('utf-8')
+        if key in times:
+            times[key] = p.properties[4][1]
+    return int(times['LocalStart'] / frame_time), int(times['LocalStop'] / frame_time)
+
+
+def evaluate(times: list, values: list, t: int) -> float:
+    """ Linear between keys, mixamo curves have a key on every frame so this hits keys exactly. """
+    i = bisect_left(times, t)
+    if i < len(times) and times[i] == t: return values[i]
+    if i == 0: return values[0]
+    if i == len(times): return values[-1]
+    w = (t - times[i-1]) / (times[i] - times[i-1])
+    return values[i-1] + (values[i] - values[i-1]) * w
+
+
+def joint_curves(scene: MixamoScene) -> list:
+    kinds = {object_id(o): o for o in scene.objects.children}
+    joint_nodes = {
+        child for child, parent, prop, _ in scene.links()
+        if child in kinds and kinds[child].name == 'AnimationCurveNode' and parent in kinds and is_joint(kinds[parent]) and prop is not None
+    }
+    return [
+        kinds[child] for child, parent, _, _ in scene.links()
+        if child in kinds and kinds[child].name == 'AnimationCurve' and parent in joint_nodes
+    ]
+
+
+def resample_curves(scene: MixamoScene, resample_resolution: int = 12, fps: int = DEFAULT_FPS) -> None:
+    frame_time = fb.KTIME_SECOND // fps
+    min_frame, max_frame = get_time_range(scene, frame_time)
+
+    for curve in joint_curves(scene):
+        times, values = curve.find('KeyTime').properties[0][1], curve.find('KeyValueFloat').properties[0][1]
+        if len(times) == 0:
+            continue
+
+        new_times = [f*frame_time for f in range(min_frame, max_frame, resample_resolution)]
+        new_values = [evaluate(times, values, t) for t in new_times]
+
+        # same as _resample_selection, the last key holds the value of the frame before it
+        new_times.append(max_frame*frame_time)
+        new_values.append(evaluate(times, values, (max_frame-1)*frame_time))
+
+        curve.find('KeyTime').properties = [('l', new_times)]
+        curve.find('KeyValueFloat').properties = [('f', new_values)]
+        curve.find('KeyAttrFlags').properties = [('i', curve.find('KeyAttrFlags').properties[0][1][:1])]
+        curve.find('KeyAttrDataFloat').properties = [('f', curve.find('KeyAttrDataFloat').properties[0][1][:4])]
+        curve.find('KeyAttrRefCount').properties = [('i', [len(new_times)])]
+
+
+def preprocess(doc: fb.FBXDocument) -> MixamoScene:
+    scene = MixamoScene(doc)
+    rename_joints(scene)
+    add_root_joint(scene)
+    remove_unused_curves(scene)
+    return scene
+
+
+def process_mesh(source: str, target: str) -> None:
+    fb.write(target, preprocess(fb.read(source)).doc)
+
+
+def process_animation(source: str, targets: dict, fps: int = DEFAULT_FPS) -> None:
+    """ Reads source once and writes one file per {resample rate: target path}. """
+    scene = preprocess(fb.read(source))
+    for n_frames, target in targets.items():
+        variant = MixamoScene(copy.deepcopy(scene.doc))
+        resample_curves(variant, n_frames, fps)
+        fb.write(target, variant.doc)
@@ -0,0 +1,30 @@
+"""
+Shared paths and a stand-in for the editor's unreal module, so the scripts under unreal/ can
+run outside the editor. Tests add whatever part of the unreal api their script touches.
+"""
+import importlib.util
+import os
+import sys
+import types
+from unittest import mock
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+UNREAL_DIR = os.path.join(ROOT, 'unreal')
+RAW_FOLDER = os.path.join(ROOT, '00_AnimsRaw')
+
+
+def stub_unreal(**attributes) -> types.ModuleType:
+    unreal = types.ModuleType('unreal')
+    unreal.log = unreal.log_warning = unreal.log_error = lambda msg: None
+    for name, value in attributes.items():
+        setattr(unreal, name, value)
+    return unreal
+
+def load_unreal_script(name: str, unreal: types.ModuleType) -> types.ModuleType:
+    """ Runs unreal/<name>.py with unreal as its unreal module. The scripts import their
+    siblings the way the editor does, as top level modules. """
+    with mock.patch.dict(sys.modules, {'unreal': unreal}), mock.patch.object(sys, 'path', sys.path + [UNREAL_DIR]):
+        spec = importlib.util.spec_from_file_location(name, os.path.join(UNREAL_DIR, f'{name}.py'))
+        script = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(script)
+    return script
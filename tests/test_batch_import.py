@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import batch_import_mixamo_animations as bima
+from tests.helpers import load_unreal_script, stub_unreal
+
+
+class StubAssetData:
+    def __init__(self, asset_name: str): self.asset_name = asset_name
+
+class StubAssetRegistry:
+    def __init__(self, assets: dict):
+        self.assets = assets
+        self.scanned = []
+
+    def scan_paths_synchronous(self, paths, force_rescan=False): self.scanned.extend(paths)
+    def get_assets_by_path(self, package_path): return [StubAssetData(a) for a in self.assets.get(package_path, [])]
+
+def stub_asset_registry(registry: StubAssetRegistry) -> types.ModuleType:
+    return stub_unreal(AssetRegistryHelpers=types.SimpleNamespace(get_asset_registry=lambda: registry))
+
+
+class TestShardedImport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_clips(self, sizes: dict) -> list:
+        files = []
+        for name, size in sizes.items():
+            path = os.path.join(self.tmp_dir.name, name)
+            with open(path, 'wb') as f:
+                f.write(b'0' * size)
+            files.append(path)
+        return files
+
+    def test_shard_clips(self):
+        files = self.make_clips({'A.fbx': 900, 'B.fbx': 500, 'C.fbx': 400, 'D.fbx': 300, 'E.fbx': 200, 'F.fbx': 100})
+        shards = bima.shard_clips(files, 2)
+
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(sorted(f for shard in shards for f in shard), sorted(files))
+        self.assertEqual(sorted(sum(os.path.getsize(f) for f in shard) for shard in shards), [1200, 1200])
+
+    def test_shard_clips_more_shards_than_clips(self):
+        files = self.make_clips({'A.fbx': 10, 'B.fbx': 20})
+        self.assertEqual(len(bima.shard_clips(files, 32)), 2)
+        self.assertEqual(bima.shard_clips([], 4), [[]])
+
+    def test_check_shard_conflicts(self):
+        files = self.make_clips({'Zombie Attack.fbx': 10, 'Zombie Idle.fbx': 10})
+        assets = bima.check_shard_conflicts([files[:1], files[1:]], '/Game/Zombie/Sk_Zombie')
+        self.assertEqual(sorted(assets), ['A_Zombie_Attack_fbx', 'A_Zombie_Idle_fbx'])
+
+        clashing = self.make_clips({'Zombie_attack.fbx': 10})
+        with self.assertRaises(ValueError):
+            bima.check_shard_conflicts([files[:1], clashing], '/Game/Zombie/Sk_Zombie')
+
+    def test_find_missing_assets(self):
+        self.assertEqual(bima.find_missing_assets(['A_Zombie_Attack_fbx', 'A_Zombie_Idle_fbx'], ['a_zombie_attack_fbx']), ['A_Zombie_Idle_fbx'])
+        self.assertEqual(bima.find_missing_assets(['A_Zombie_Attack_fbx'], ['A_Zombie_Attack_fbx', 'Sk_Zombie']), [])
+
+    def test_rescan_assets(self):
+        registry = StubAssetRegistry({'/Game/Zombie/Anims': ['A_Zombie_Idle_fbx', 'A_Zombie_Attack_fbx']})
+        output_file = os.path.join(self.tmp_dir.name, 'found.json')
+
+        rescan_assets = load_unreal_script('rescan_assets', stub_asset_registry(registry))
+        rescan_assets.rescan_assets('/Game/Zombie/Anims', output_file)
+
+        self.assertEqual(registry.scanned, ['/Game/Zombie/Anims'])
+        with open(output_file, 'r') as f:
+            self.assertEqual(json.load(f), ['A_Zombie_Attack_fbx', 'A_Zombie_Idle_fbx'])
+
+    def run_sharded(self, rescan_writes: list, shard_results: dict = None, clips: list = ('Zombie Attack.fbx', 'Zombie Idle.fbx')) -> list:
+        """ Runs import_animations_sharded against fake editors. Each shard writes the shard_results
+        entry for its index (a clean skeleton by default, nothing when None) and the rescan writes
+        rescan_writes, nothing when None. Returns the editor command lines. """
+        shard_results = shard_results or {}
+        anims_folder = os.path.join(self.tmp_dir.name, 'Anims')
+        os.makedirs(anims_folder)
+        for name in clips:
+            with open(os.path.join(anims_folder, name), 'wb') as f:
+                f.write(b'0')
+
+        commands = []
+        def popen(cmd):
+            args = cmd[-1].split(' ')
+            self.assertTrue(os.path.isfile(args[args.index('--clips') + 1]))
+            result = shard_results.get(len(commands), {'skeleton_modified': False})
+            if result is not None:
+                with open(args[args.index('--result_file') + 1], 'w') as f:
+                    json.dump(result, f)
+            commands.append(cmd)
+            return mock.Mock(wait=lambda: 0)
+
+        def run(cmd):
+            commands.append(cmd)
+            if rescan_writes is not None:
+                with open(cmd[-1].split(' ')[-1], 'w') as f:
+                    json.dump(rescan_writes, f)
+            return mock.Mock(check_returncode=lambda: None)
+
+        with mock.patch.object(bima.subprocess, 'Popen', popen), mock.patch.object(bima.subprocess, 'run', run):
+            try:
+                bima.import_animations_sharded('UnrealEditor', 'Project.uproject', anims_folder, '/Game/Zombie/Anims', '/Game/Zombie/Sk_Zombie', 2)
+            finally:
+                self.assertEqual(sorted(os.listdir(anims_folder)), sorted(clips))
+        return commands
+
+    def test_import_animations_sharded(self):
+        commands = self.run_sharded(['A_Zombie_Attack_fbx', 'A_Zombie_Idle_fbx'])
+        self.assertEqual(len(commands), 3)
+
+    def test_import_animations_sharded_no_clips(self):
+        self.assertEqual(self.run_sharded(None, clips=[]), [])
+
+    def test_import_animations_sharded_missing_asset(self):
+        with self.assertRaises(RuntimeError):
+            self.run_sharded(['A_Zombie_Attack_fbx'])
+
+    def test_import_animations_sharded_rescan_without_results(self):
+        with self.assertRaises(RuntimeError):
+            self.run_sharded(None)
+
+    def test_import_animations_sharded_shard_without_results(self):
+        with self.assertRaisesRegex(RuntimeError, r'shards \[1\] failed'):
+            self.run_sharded(['A_Zombie_Attack_fbx', 'A_Zombie_Idle_fbx'], {1: None})
+
+    def test_import_animations_sharded_skeleton_modified(self):
+        with self.assertRaisesRegex(RuntimeError, 'Sk_Zombie'):
+            self.run_sharded(['A_Zombie_Attack_fbx', 'A_Zombie_Idle_fbx'], {0: {'skeleton_modified': True}})
+
+
+class TestRun(unittest.TestCase):
+
+    def test_scheduled_standalone_jobs_use_one_process(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(bima.scheduler, 'schedule_batch', side_effect=RuntimeError) as schedule_batch:
+            with self.assertRaises(RuntimeError):
+                bima.run('mayapy', 'UnrealEditor', 'Source', tmp_dir, 'Project.uproject', '/Game/Zombie', engine='python', schedule=True, jobs=4)
+
+        cmd, _, jobs, _ = schedule_batch.call_args.args
+        self.assertEqual(cmd[-2:], ['--jobs', '1'])
+        self.assertEqual(jobs, 4)
+
+
+class StubPackage:
+    def __init__(self, path_name: str): self.path_name = path_name
+    def get_path_name(self) -> str: return self.path_name
+
+class TestImportResult(unittest.TestCase):
+
+    def test_write_result(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            result_file = os.path.join(tmp_dir, 'shard_0.json')
+            for dirty, modified in [(['/Game/Zombie/Anims/A_Zombie_Idle'], False), (['/Game/Zombie/Sk_Zombie'], True)]:
+                unreal = stub_unreal(AssetImportTask=object, EditorLoadingAndSavingUtils=types.SimpleNamespace(
+                    get_dirty_content_packages=lambda: [StubPackage(p) for p in dirty]
+                ))
+                load_unreal_script('import_animations', unreal).write_result(result_file, '/Game/Zombie/Sk_Zombie.Sk_Zombie')
+                with open(result_file, 'r') as f:
+                    self.assertEqual(json.load(f), {'skeleton_modified': modified})
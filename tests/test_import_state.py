@@ -0,0 +1,117 @@
+import os
+import tempfile
+import types
+import unittest
+
+from tests.helpers import load_unreal_script, stub_unreal
+from unreal import import_state as ist
+
+
+class StubImportTask:
+    def __init__(self):
+        self.options = types.SimpleNamespace()
+        self.imported_object_paths = []
+
+def stub_import_tools(failing: set, saved: list) -> types.ModuleType:
+    """ Imports of files in failing produce nothing, everything passed to save lands in saved. """
+    def import_asset_tasks(tasks):
+        for task in tasks:
+            if os.path.basename(task.filename) not in failing:
+                task.imported_object_paths = [f'{task.destination_path}/{task.destination_name}']
+
+    def save_loaded_assets(assets, only_if_is_dirty=True):
+        saved.extend(assets)
+        return True
+
+    return stub_unreal(
+        AssetImportTask=StubImportTask,
+        FbxImportUI=types.SimpleNamespace,
+        FBXImportType=types.SimpleNamespace(FBXIT_ANIMATION='FBXIT_ANIMATION'),
+        AssetToolsHelpers=types.SimpleNamespace(get_asset_tools=lambda: types.SimpleNamespace(import_asset_tasks=import_asset_tasks)),
+        EditorAssetLibrary=types.SimpleNamespace(save_loaded_assets=save_loaded_assets),
+        load_asset=lambda path: path,
+    )
+
+
+class TestImportState(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.files = []
+        for name in ['Zombie Attack.fbx', 'Zombie Idle.fbx', 'Zombie Walking.fbx']:
+            path = os.path.join(self.tmp_dir.name, name)
+            with open(path, 'wb') as f:
+                f.write(name.encode())
+            self.files.append(path)
+        self.state_path = os.path.join(self.tmp_dir.name, '.import_state.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resume_skips_saved(self):
+        state = ist.ImportState.load(self.state_path, '/Game/Anims')
+        self.assertEqual(state.pending(self.files), self.files)
+
+        state.mark(self.files[:1], ist.SAVED)
+        state.mark(self.files[1:], ist.IMPORTED)
+
+        resumed = ist.ImportState.load(self.state_path, '/Game/Anims')
+        self.assertEqual(resumed.status(self.files[0]), ist.SAVED)
+        self.assertEqual(resumed.status(self.files[1]), ist.IMPORTED)
+        self.assertEqual(resumed.pending(self.files), self.files[1:])
+
+    def test_changed_file_is_pending(self):
+        state = ist.ImportState.load(self.state_path, '/Game/Anims')
+        state.mark(self.files, ist.SAVED)
+
+        with open(self.files[2], 'ab') as f:
+            f.write(b'reprocessed')
+
+        resumed = ist.ImportState.load(self.state_path, '/Game/Anims')
+        self.assertEqual(resumed.pending(self.files), self.files[2:])
+
+    def test_other_destination_is_ignored(self):
+        ist.ImportState.load(self.state_path, '/Game/Anims').mark(self.files, ist.SAVED)
+        self.assertEqual(ist.ImportState.load(self.state_path, '/Game/Anims_R4').pending(self.files), self.files)
+
+    def test_clear(self):
+        state = ist.ImportState.load(self.state_path, '/Game/Anims')
+        state.mark(self.files, ist.SAVED)
+        state.clear()
+        self.assertFalse(os.path.exists(self.state_path))
+        self.assertEqual(ist.ImportState.load(self.state_path, '/Game/Anims').pending(self.files), self.files)
+
+
+class TestDeferredImport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for name in ['Zombie Attack.fbx', 'Zombie Idle.fbx', 'Zombie Walking.fbx']:
+            with open(os.path.join(self.tmp_dir.name, name), 'wb') as f:
+                f.write(name.encode())
+        self.state_path = os.path.join(self.tmp_dir.name, '.import_state.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def import_animations(self, failing: set, saved: list, batch_size: int = 0) -> None:
+        import_animations = load_unreal_script('import_animations', stub_import_tools(failing, saved))
+        import_animations.import_animations(
+            self.tmp_dir.name, '/Game/Zombie/Anims', '/Game/Zombie/Sk_Zombie', deferred_save=True, batch_size=batch_size
+        )
+
+    def test_failed_import_is_not_saved(self):
+        saved = []
+        with self.assertRaises(RuntimeError):
+            self.import_animations({'Zombie Idle.fbx'}, saved, batch_size=2)
+
+        self.assertEqual(saved, ['/Game/Zombie/Anims/A_Zombie_Attack.fbx', '/Game/Zombie/Anims/A_Zombie_Walking.fbx'])
+        state = ist.ImportState.load(self.state_path, '/Game/Zombie/Anims')
+        files = [os.path.join(self.tmp_dir.name, f) for f in ['Zombie Attack.fbx', 'Zombie Idle.fbx', 'Zombie Walking.fbx']]
+        self.assertEqual([state.status(f) for f in files], [ist.SAVED, ist.PENDING, ist.SAVED])
+
+        # the rerun only imports the clip that failed
+        saved = []
+        self.import_animations(set(), saved)
+        self.assertEqual(saved, ['/Game/Zombie/Anims/A_Zombie_Idle.fbx'])
+        self.assertFalse(os.path.exists(self.state_path))
@@ -0,0 +1,141 @@
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+
+import scheduler as sch
+from tests.helpers import RAW_FOLDER
+
+
+class TestCostModel(unittest.TestCase):
+
+    def test_read_clip_info(self):
+        info = sch.read_clip_info(os.path.join(RAW_FOLDER, 'Anims', 'Zombie Attack.fbx'))
+        self.assertEqual((info.frames, info.joints), (79, 59))
+        self.assertEqual(info.work(), 79 * 59)
+
+    def test_uninspected_clip_uses_size(self):
+        info = sch.ClipInfo('huge mocap.fbx', 1000 * 1000)
+        self.assertEqual(info.work(), 1000 * 1000 / sch.BYTES_PER_WORK_UNIT)
+
+    def test_calibrate(self):
+        history = [{'work': w, 'actual': 2.0 + 0.01 * w, 'status': 'done'} for w in [100, 500, 1000, 4000]]
+        history.append({'work': 100, 'actual': 900.0, 'status': 'timeout'})
+
+        model = sch.CostModel()
+        model.calibrate(history)
+        self.assertAlmostEqual(model.overhead, 2.0)
+        self.assertAlmostEqual(model.seconds_per_unit, 0.01)
+
+    def test_fit_per_engine_and_kind(self):
+        def records(engine, kind, overhead, seconds_per_unit):
+            return [
+                {'engine': engine, 'kind': kind, 'work': w, 'actual': overhead + seconds_per_unit * w, 'status': 'done'}
+                for w in [100, 500, 1000, 4000]
+            ]
+        history = records('maya', sch.CLIP_JOB, 30.0, 0.01) + records('python', sch.CLIP_JOB, 0.05, 0.0001)
+        history += records('maya', sch.MESH_JOB, 60.0, 0.001)
+        # records from before engines were tracked are left out of every fit
+        history += [{'work': w, 'actual': 500.0, 'status': 'done'} for w in [10, 20]]
+
+        for engine, kind, overhead, seconds_per_unit in [
+            ('maya', sch.CLIP_JOB, 30.0, 0.01), ('python', sch.CLIP_JOB, 0.05, 0.0001), ('maya', sch.MESH_JOB, 60.0, 0.001)
+        ]:
+            model = sch.fit_cost_model(history, engine, kind)
+            self.assertAlmostEqual(model.overhead, overhead)
+            self.assertAlmostEqual(model.seconds_per_unit, seconds_per_unit)
+
+        default = sch.CostModel()
+        model = sch.fit_cost_model(history, 'python', sch.MESH_JOB)
+        self.assertEqual((model.overhead, model.seconds_per_unit), (default.overhead, default.seconds_per_unit))
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_longest_first_makespan(self):
+        rng = random.Random(7)
+        model = sch.CostModel(overhead=5.0, seconds_per_unit=0.01)
+
+        # listdir order: a batch of short clips with a long mocap clip at the end
+        infos = [sch.ClipInfo(f'clip_{i}.fbx', 0, rng.randint(30, 600), 59) for i in range(40)]
+        infos.append(sch.ClipInfo('mocap.fbx', 0, 2400, 59))
+        jobs = [sch.make_job(info.path, [], info, model) for info in infos]
+
+        # actual durations are off from the prediction by up to 20%
+        actual = {job.name: job.predicted * rng.uniform(0.8, 1.2) for job in jobs}
+
+        listdir_makespan = sch.simulate_makespan([actual[j.name] for j in jobs], 8)
+        scheduled_makespan = sch.simulate_makespan([actual[j.name] for j in sch.order_longest_first(jobs)], 8)
+
+        lower_bound = max(max(actual.values()), sum(actual.values()) / 8)
+        self.assertLess(scheduled_makespan, listdir_makespan * 0.8)
+        self.assertLess(scheduled_makespan, lower_bound * 1.1)
+
+    def test_straggler_is_retried_alone(self):
+        jobs = [sch.Job(f'clip_{i}', [], predicted=float(i), budget=10.0) for i in range(6)]
+        jobs.append(sch.Job('hung', [], predicted=3.0, budget=10.0))
+
+        lock, running, calls = threading.Lock(), set(), []
+        def run_job(job, timeout):
+            with lock:
+                running.add(job.name)
+                calls.append((job.name, timeout, set(running)))
+            try:
+                if job.name == 'hung' and timeout == job.budget:
+                    raise subprocess.TimeoutExpired(job.cmd, timeout)
+            finally:
+                with lock:
+                    running.discard(job.name)
+
+        records = sch.run_jobs(jobs, 4, run_job)
+
+        self.assertEqual([c[0] for c in calls][0], 'clip_5')
+        self.assertEqual(calls[-1], ('hung', 20.0, {'hung'}))
+        self.assertEqual([(r['name'], r['status']) for r in records if r['name'] == 'hung'], [('hung', 'timeout'), ('hung', 'done')])
+
+    def test_schedule_batch(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # the sample folder ships without a mesh fbx, any mixamo fbx stands in for one
+            source_folder = os.path.join(tmp_dir, 'Source')
+            shutil.copytree(os.path.join(RAW_FOLDER, 'Anims'), os.path.join(source_folder, 'Anims'))
+            os.makedirs(os.path.join(source_folder, 'Mesh'))
+            shutil.copy(os.path.join(RAW_FOLDER, 'Anims', 'Zombie Idle.fbx'), os.path.join(source_folder, 'Mesh', 'Zombie.fbx'))
+
+            history_file = os.path.join(tmp_dir, 'history.json')
+            cmds = {}
+            def run_job(job, timeout): cmds[job.name] = job.cmd
+
+            records = sch.schedule_batch(['mayapy', 'batch_process_mixamo.py'], source_folder, 2, history_file, run_job)
+
+            clips = sorted(f for f in os.listdir(os.path.join(source_folder, 'Anims')) if f.endswith('.fbx'))
+            self.assertEqual(sorted(cmds), sorted(clips + ['Mesh/Zombie.fbx']))
+            self.assertEqual(cmds['Mesh/Zombie.fbx'], ['mayapy', 'batch_process_mixamo.py', '--clips'])
+            for clip in clips:
+                self.assertEqual(cmds[clip], ['mayapy', 'batch_process_mixamo.py', '--no_mesh', '--clips', clip])
+
+            history = sch.load_history(history_file)
+            self.assertEqual(len(history), len(records))
+            self.assertEqual({r['name']: r['kind'] for r in history}, {**{c: sch.CLIP_JOB for c in clips}, 'Mesh/Zombie.fbx': sch.MESH_JOB})
+            self.assertTrue(all(r['engine'] == 'maya' for r in history))
+
+            def failing_run_job(job, timeout): raise subprocess.CalledProcessError(1, job.cmd)
+            with self.assertRaises(RuntimeError):
+                sch.schedule_batch(['mayapy'], source_folder, 2, history_file, failing_run_job)
+            self.assertEqual(len(sch.load_history(history_file)), 2 * len(records))
+
+    def test_spawn_failure_is_recorded(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_folder = os.path.join(tmp_dir, 'Source')
+            shutil.copytree(os.path.join(RAW_FOLDER, 'Anims'), os.path.join(source_folder, 'Anims'))
+            os.makedirs(os.path.join(source_folder, 'Mesh'))
+
+            history_file = os.path.join(tmp_dir, 'history.json')
+            with self.assertRaises(RuntimeError):
+                sch.schedule_batch([os.path.join(tmp_dir, 'missing', 'mayapy')], source_folder, 2, history_file)
+
+            history = sch.load_history(history_file)
+            self.assertEqual(len(history), len(os.listdir(os.path.join(source_folder, 'Anims'))))
+            self.assertTrue(all(r['status'] == 'failed' for r in history))
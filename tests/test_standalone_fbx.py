@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'standalone'))
+
+import fbx_binary as fb
+import process_mixamo as pm
+from tests.helpers import RAW_FOLDER, ROOT
+
+
+RAW_ANIMS = os.path.join(RAW_FOLDER, 'Anims')
+MAYA_ANIMS = os.path.join(ROOT, '00_AnimsRaw_Processed', 'Anims')
+
+
+def skeleton(scene: pm.MixamoScene) -> dict:
+    objects = scene.objects_by_id()
+    joints = {pm.object_id(j): j for j in scene.joints()}
+    parents = scene.parent_ids(set(joints))
+    return {pm.object_name(j): pm.object_name(objects[parents[i]]) if parents[i] in objects else None for i, j in joints.items()}
+
+def joint_curves(scene: pm.MixamoScene) -> dict:
+    """ (joint, property, channel) -> (key times, key values) """
+    objects = scene.objects_by_id()
+    nodes = {
+        child: (pm.object_name(objects[parent]), prop) for child, parent, prop, _ in scene.links()
+        if child in objects and objects[child].name == 'AnimationCurveNode' and parent in objects and pm.is_joint(objects[parent])
+    }
+    return {
+        nodes[parent] + (prop,): (objects[child].find('KeyTime').properties[0][1], objects[child].find('KeyValueFloat').properties[0][1])
+        for child, parent, prop, _ in scene.links() if parent in nodes and objects[child].name == 'AnimationCurve'
+    }
+
+
+class TestFormatJointName(unittest.TestCase):
+
+    def test_format_joint_name(self):
+        cases = [
+            ('mixamorig:Hips', 'Hips'),
+            ('mixamorig:LeftUpLeg', 'L_UpLeg'),
+            ('mixamorig:RightHandThumb4', 'R_HandThumb4'),
+            ('Left_Arm', 'L_Arm'),
+            ('R_Foot', 'R_Foot'),
+        ]
+        for case in cases:
+            self.assertEqual(pm.format_joint_name(case[0]), case[1])
+
+
+class TestStandaloneProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        source = os.path.join(RAW_ANIMS, 'Zombie Idle.fbx')
+        target = os.path.join(self.tmp_dir.name, 'Zombie Idle.fbx')
+        doc = fb.read(source)
+        fb.write(target, doc)
+
+        def assert_equal_nodes(a: fb.FBXNode, b: fb.FBXNode):
+            self.assertEqual((a.name, a.properties, len(a.children)), (b.name, b.properties, len(b.children)))
+            for child_a, child_b in zip(a.children, b.children):
+                assert_equal_nodes(child_a, child_b)
+
+        written = fb.read(target)
+        self.assertEqual(doc.version, written.version)
+        for a, b in zip(doc.nodes, written.nodes):
+            assert_equal_nodes(a, b)
+
+    def test_matches_maya_output(self):
+        for clip in sorted(f for f in os.listdir(RAW_ANIMS) if f.endswith('.fbx')):
+            with self.subTest(clip=clip):
+                target = os.path.join(self.tmp_dir.name, clip)
+                pm.process_animation(os.path.join(RAW_ANIMS, clip), {12: target})
+
+                ours, maya = pm.MixamoScene(fb.read(target)), pm.MixamoScene(fb.read(os.path.join(MAYA_ANIMS, clip)))
+                self.assertEqual(skeleton(ours), skeleton(maya))
+
+                our_curves, maya_curves = joint_curves(ours), joint_curves(maya)
+                self.assertEqual(set(our_curves), set(maya_curves))
+                for key, (times, values) in our_curves.items():
+                    maya_times, maya_values = maya_curves[key]
+                    self.assertEqual(times, maya_times, key)
+                    for value, maya_value in zip(values, maya_values):
+                        self.assertAlmostEqual(value, maya_value, places=3, msg=key)
+
+    def test_resample_variants(self):
+        source = os.path.join(RAW_ANIMS, 'Zombie Walking.fbx')
+        targets = {n: os.path.join(self.tmp_dir.name, f'Zombie Walking_R{n}.fbx') for n in [1, 4, 12]}
+        pm.process_animation(source, targets)
+
+        raw_curves = joint_curves(pm.MixamoScene(fb.read(source)))
+        for n, target in targets.items():
+            curves = joint_curves(pm.MixamoScene(fb.read(target)))
+            times, values = curves[('Hips', 'Lcl Translation', 'd|Y')]
+            raw_times, raw_values = raw_curves[('mixamorig:Hips', 'Lcl Translation', 'd|Y')]
+
+            self.assertEqual(times[:-1], raw_times[:-1:n])
+            self.assertEqual(values[:-1], raw_values[:-1:n])
+
+    def test_missing_root(self):
+        doc = fb.read(os.path.join(RAW_ANIMS, 'Zombie Idle.fbx'))
+        scene = pm.MixamoScene(doc)
+        scene.remove_objects({pm.object_id(j) for j in scene.joints()})
+        with self.assertRaises(ValueError):
+            pm.add_root_joint(scene)
@@ -1,3 +1,4 @@
+from argparse import ArgumentTypeError
 import unittest
 
 import sys
@@ -70,6 +71,47 @@ class TestAssetRename(unittest.TestCase):
         ]
         for case in cases:
             self.assertEqual(uu.format_texture_name('Zombie', case[0]), case[1])
-        
 
+    def test_parse_resample_rates(self):
+        cases = [
+            ('12', [12]),
+            ('1,4,12', [1, 4, 12]),
+            ('12, 4,1,4', [1, 4, 12]),
+        ]
+        for case in cases:
+            self.assertEqual(uu.parse_resample_rates(case[0]), case[1])
+
+        for case in ['', '0,4', '-1', 'a,4']:
+            with self.assertRaises(ArgumentTypeError):
+                uu.parse_resample_rates(case)
+
+    def test_resample_variant_name(self):
+        cases = [
+            ('Anims', 4, [12], 'Anims'),
+            ('Anims', 4, [1, 4, 12], 'Anims_R4'),
+            ('Zombie Attack.fbx', 12, [1, 12], 'Zombie Attack_R12.fbx'),
+        ]
+        for case in cases:
+            self.assertEqual(uu.resample_variant_name(case[0], case[1], case[2]), case[3])
+
+    def test_format_resampled_animation(self):
+        cases = [
+            ('Zombie Attack_R4', 'A_Zombie_Attack_R4', 4),
+            ('Zombie Attack r12', 'A_Zombie_Attack_R12', 12),
+            ('Anim_ZombieAttack02_final_R1', 'A_Zombie_Attack02_final_R1', 1),
+            ('Zombie Attack_R4.fbx', 'A_Zombie_Attack_R4.fbx', 4),
+            ('Zombie Attack.fbx', 'A_Zombie_Attack.fbx', None),
+        ]
+        for case in cases:
+            self.assertEqual(uu.format_asset_name(case[0], 'Animation', 'Zombie'), case[1])
+            self.assertEqual(uu.get_resample_rate(case[0]), case[2])
+
+    def test_resample_suffix_only_on_animations(self):
+        cases = [
+            ('Wall_R2', 'Material', 'M_Zombie_Wall_R2'),
+            ('Zombie_R4', 'Skeleton', 'Sk_Zombie_R4'),
+            ('Body_R1', 'SkeletalMesh', 'SkMsh_Zombie_Body_R1'),
+        ]
+        for case in cases:
+            self.assertEqual(uu.format_asset_name(case[0], case[1], 'Zombie'), case[2])
 
@@ -1,4 +1,5 @@
 import unreal
+import json
 import re
 import os
 from argparse import ArgumentParser
@@ -7,42 +8,100 @@ import sys
 sys.path.append("D:\\Code\\maya-api\\unreal")
 
 import unreal_utils as uu
+import import_state as ist
 import importlib
 importlib.reload(uu)
+importlib.reload(ist)
 
-def import_animations(directory: str, destination_path: str, skeleton_asset: str) -> None:
+STATE_FILE_NAME = '.import_state.json'
+
+def create_import_task(fname: str, destination_path: str, basename: str, skeleton, save: bool) -> unreal.AssetImportTask:
+    task = unreal.AssetImportTask()
+    task.filename = fname
+    task.destination_path = destination_path
+    task.destination_name = uu.format_asset_name(os.path.basename(fname), 'Animation', basename)
+
+    task.replace_existing = True
+    task.automated = True
+    task.save = save
+
+    task.options = unreal.FbxImportUI()
+    task.options.import_materials = False
+    task.options.import_animations = True
+    task.options.import_as_skeletal = True
+    task.options.import_mesh = False
+
+    task.options.skeleton = skeleton
+    task.options.mesh_type_to_import = unreal.FBXImportType.FBXIT_ANIMATION 
+    task.options.automated_import_should_detect_type = False
+    return task
+
+def save_imported_assets(tasks: list) -> None:
+    """ Saves every package imported by tasks in one pass. """
+    asset_paths = [str(p) for task in tasks for p in task.imported_object_paths]
+    unreal.log(f'Saving {len(asset_paths)} imported assets')
+    assets = [unreal.load_asset(p) for p in asset_paths]
+    if not unreal.EditorAssetLibrary.save_loaded_assets([a for a in assets if a is not None], only_if_is_dirty=True):
+        raise RuntimeError(f"failed to save imported assets in {tasks[0].destination_path}")
+
+def write_result(result_file: str, skeleton_asset: str) -> None:
+    """ Tells the process that started this editor the import finished, and whether it left the
+    skeleton modified. Editors importing in parallel would each save their own version of it. """
+    skeleton_package = skeleton_asset.split('.')[0]
+    dirty_packages = [p.get_path_name() for p in unreal.EditorLoadingAndSavingUtils.get_dirty_content_packages()]
+    with open(result_file, 'w') as f:
+        json.dump({'skeleton_modified': skeleton_package in dirty_packages}, f)
+
+def import_animations(
+    directory: str, destination_path: str, skeleton_asset: str,
+    deferred_save: bool = False, batch_size: int = 0, state_file: str = None, clips: list = None
+) -> None:
     assert directory is not None and isinstance(directory, str), f"invalid directory passed {directory}"
     assert destination_path is not None and isinstance(destination_path, str), f"invalid destination_path passed {destination_path}"
     assert skeleton_asset is not None and isinstance(skeleton_asset, str), f"invalid skeleton_asset passed {skeleton_asset}"
 
 
-    basename = uu.remove_preffix(skeleton_asset.split('/')[-1], 'Sk_')
+    basename = uu.skeleton_basename(skeleton_asset)
+    skeleton = unreal.load_asset(skeleton_asset)
+    files = [f for f in map(lambda f: os.path.join(directory,f), sorted(os.listdir(directory))) if os.path.isfile(f) and f.endswith('.fbx')]
+    if clips is not None:
+        files = [f for f in files if os.path.basename(f) in clips]
+
+    if not deferred_save:
+        tasks = [create_import_task(f, destination_path, basename, skeleton, save=True) for f in files]
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(tasks)
+        return
 
-    tasks = []
-    for fname in list(map(lambda f: os.path.join(directory,f), os.listdir(directory))):
-        if os.path.isdir(fname):
-            continue
+    # clips are only marked as saved once their packages are on disk, rerunning after an
+    # interruption re-imports whatever didn't make it
+    state = ist.ImportState.load(state_file or os.path.join(directory, STATE_FILE_NAME), destination_path)
+    pending = state.pending(files)
+    unreal.log(f'Importing {len(pending)} of {len(files)} animations, {len(files)-len(pending)} already saved')
 
-        task = unreal.AssetImportTask()
-        task.filename = fname
-        task.destination_path = destination_path
-        task.destination_name = uu.format_asset_name(os.path.basename(fname), 'Animation', basename)
+    failed = []
+    batch_size = batch_size if batch_size > 0 else max(len(pending), 1)
+    for i in range(0, len(pending), batch_size):
+        batch = pending[i:i+batch_size]
+        tasks = [create_import_task(f, destination_path, basename, skeleton, save=False) for f in batch]
 
-        task.replace_existing = True
-        task.automated = True
-        task.save = True
+        state.mark(batch, ist.IMPORTED)
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(tasks)
 
-        task.options = unreal.FbxImportUI()
-        task.options.import_materials = False
-        task.options.import_animations = True
-        task.options.import_as_skeletal = True
-        task.options.import_mesh = False
+        # a failed import leaves no object paths, nothing of it gets saved
+        imported = [task for task in tasks if len(task.imported_object_paths) > 0]
+        if len(imported) > 0:
+            save_imported_assets(imported)
+        state.mark([task.filename for task in imported], ist.SAVED)
 
-        task.options.skeleton = unreal.load_asset(skeleton_asset)
-        task.options.mesh_type_to_import = unreal.FBXImportType.FBXIT_ANIMATION 
-        task.options.automated_import_should_detect_type = False
-        tasks.append(task)
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(tasks)
+        batch_failed = [task.filename for task in tasks if len(task.imported_object_paths) == 0]
+        state.mark(batch_failed, ist.PENDING)
+        for f in batch_failed:
+            unreal.log_error(f'Failed to import {f}')
+        failed.extend(batch_failed)
+
+    if len(failed) > 0:
+        raise RuntimeError(f"failed to import {len(failed)} animations: {[os.path.basename(f) for f in failed]}")
+    state.clear()
 
 
 if __name__ == "__main__":
@@ -50,6 +109,18 @@ if __name__ == "__main__":
     parser.add_argument("directory")
     parser.add_argument("destination_path")
     parser.add_argument("skeleton_asset")
+    parser.add_argument("--deferred_save", action='store_true', help="Import every clip before saving, then save them in one pass.")
+    parser.add_argument("--batch_size", type=int, default=0, help="Clips imported per save pass with --deferred_save, 0 for all.")
+    parser.add_argument("--state_file", default=None, help=f"Resume journal for --deferred_save, defaults to {STATE_FILE_NAME} in directory.")
+    parser.add_argument("--clips", default=None, help="Text file listing the clips in directory to import, one per line. Defaults to all.")
+    parser.add_argument("--result_file", default=None, help="Json file written once the import finished, says if the skeleton was modified.")
 
     args = parser.parse_args()
-    import_animations(args.directory, args.destination_path, args.skeleton_asset)
+
+    clips = None
+    if args.clips is not None:
+        with open(args.clips, 'r') as f:
+            clips = [l.strip() for l in f.readlines() if len(l.strip()) > 0]
+    import_animations(args.directory, args.destination_path, args.skeleton_asset, args.deferred_save, args.batch_size, args.state_file, clips)
+    if args.result_file is not None:
+        write_result(args.result_file, args.skeleton_asset)
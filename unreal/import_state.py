@@ -0,0 +1,59 @@
+"""
+Journal for imports that save packages in bulk. Clips only count as done once their
+packages are on disk, so an interrupted run picks up the ones that weren't saved.
+"""
+import json
+import os
+
+PENDING = 'pending'
+IMPORTED = 'imported'
+SAVED = 'saved'
+
+
+def file_signature(path: str) -> list:
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+class ImportState:
+    def __init__(self, path: str, destination_path: str, clips: dict = None):
+        self.path = path
+        self.destination_path = destination_path
+        self.clips = clips if clips is not None else {} # file name -> {status, signature}
+
+    @classmethod
+    def load(cls, path: str, destination_path: str) -> 'ImportState':
+        if not os.path.isfile(path):
+            return cls(path, destination_path)
+
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        # a journal for another destination says nothing about this one
+        if data.get('destination_path') != destination_path:
+            return cls(path, destination_path)
+        return cls(path, destination_path, data.get('clips', {}))
+
+    def status(self, file: str) -> str:
+        clip = self.clips.get(os.path.basename(file))
+        if clip is None or clip['signature'] != file_signature(file):
+            return PENDING
+        return clip['status']
+
+    def pending(self, files: list) -> list:
+        return [f for f in files if self.status(f) != SAVED]
+
+    def mark(self, files: list, status: str) -> None:
+        for f in files:
+            self.clips[os.path.basename(f)] = {'status': status, 'signature': file_signature(f)}
+        self.write()
+
+    def write(self) -> None:
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'destination_path': self.destination_path, 'clips': self.clips}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.isfile(self.path):
+            os.remove(self.path)
@@ -0,0 +1,26 @@
+from argparse import ArgumentParser
+import json
+
+import unreal
+
+
+def rescan_assets(package_path: str, output_file: str) -> list:
+    """ Rescans package_path so assets saved by other editor processes show up and writes their names to output_file. """
+    reg = unreal.AssetRegistryHelpers.get_asset_registry()
+    reg.scan_paths_synchronous([package_path], True)
+
+    asset_names = sorted(str(a.asset_name) for a in reg.get_assets_by_path(package_path))
+    unreal.log(f'Found {len(asset_names)} assets in {package_path}')
+
+    with open(output_file, 'w') as f:
+        json.dump(asset_names, f, indent=2)
+    return asset_names
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("package_path")
+    parser.add_argument("output_file")
+
+    args = parser.parse_args()
+    rescan_assets(args.package_path, args.output_file)
@@ -1,3 +1,4 @@
+from argparse import ArgumentTypeError
 import re
 from collections import defaultdict
 from functools import partial
@@ -67,11 +68,45 @@ def format_texture_name(basename: str, texture_name: str) -> str:
     final_name = format_suffix(format_preffix(final_name, 'T_', 'TEXTUREtexture'), found_rule[0], found_rule[1]).replace(' ','_')
     return final_name
 
+# resampled variants of an animation: "Zombie Attack_R4" is keyed every 4 frames
+def resample_suffix_regex(): return r'(\s|_)[Rr](\d+)$'
+def resample_suffix(n_frames: int) -> str: return f'_R{n_frames}'
+def get_resample_rate(name: str):
+    m = re.search(resample_suffix_regex(), remove_file_ext(name))
+    return int(m.group(2)) if m is not None else None
+def remove_resample_suffix(name: str) -> str: return re.sub(resample_suffix_regex(), '', name)
+
+def parse_resample_rates(s: str) -> list:
+    """ argparse type for --resample, bad input is reported as a usage error. """
+    try:
+        rates = sorted({int(n) for n in s.split(',') if n.strip()})
+    except ValueError:
+        raise ArgumentTypeError(f"invalid resample rates: {s}")
+    if len(rates) == 0 or any(n <= 0 for n in rates):
+        raise ArgumentTypeError(f"invalid resample rates: {s}")
+    return rates
+
+def resample_variant_name(name: str, n_frames: int, rates: list) -> str:
+    """ Names a file/folder for one of the resample rates. Single rate runs keep the original name. """
+    if len(rates) == 1: return name
+    base_name = remove_file_ext(name)
+    return base_name + resample_suffix(n_frames) + name[len(base_name):]
+
 def _format_asset_name(basename: str, name: str, target_preffix: str, preffix_capture: str) -> str:
     final_name = remove_suffix(remove_preffix(name, preffix_capture), preffix_capture)
     final_name = format_default_asset(basename, final_name)
     return format_preffix(final_name, target_preffix, preffix_capture).replace(' ', '_')
 
+def format_animation_name(basename: str, name: str) -> str:
+    """ Keeps the _R<n> suffix of resampled variants at the end of the formatted name. """
+    base_name = remove_file_ext(name)
+    rate = get_resample_rate(base_name)
+    if rate is None:
+        return _format_asset_name(basename, name, 'A_', 'animation')
+
+    final_name = _format_asset_name(basename, remove_resample_suffix(base_name), 'A_', 'animation')
+    return final_name + resample_suffix(rate) + name[len(base_name):]
+
 
 ASSET_RENAME_FN_LOOKUP = defaultdict(lambda: format_default_asset)
 for t in [
@@ -79,10 +114,16 @@ for t in [
     ('Skeleton', 'Sk_', 'skeleton'),
     ('SkeletalMesh', 'SkMsh_', 'mesh'),
     ('PhysicsAsset', 'Phys_', 'physicsasset'),
-    ('Animation', 'A_', 'animation')
 ]:
     ASSET_RENAME_FN_LOOKUP[t[0]] = partial(_format_asset_name, target_preffix=t[1], preffix_capture=t[2])
+ASSET_RENAME_FN_LOOKUP['Animation'] = format_animation_name
 ASSET_RENAME_FN_LOOKUP['Texture2D'] = format_texture_name
 
 def format_asset_name(asset: str, asset_type: str, basename: str) -> str:
-    return ASSET_RENAME_FN_LOOKUP.get(asset_type)(basename, asset)
\ No newline at end of file
+    return ASSET_RENAME_FN_LOOKUP.get(asset_type)(basename, asset)
+
+def skeleton_basename(skeleton_asset: str) -> str: return remove_preffix(skeleton_asset.split('/')[-1], 'Sk_')
+
+# characters unreal replaces with _ when creating objects (INVALID_OBJECTNAME_CHARACTERS)
+INVALID_OBJECT_NAME_CHARACTERS = '"\' ,/.:|&!~\n\r\t@#(){}[]=;^%$`'
+def sanitize_object_name(name: str) -> str: return re.sub('[' + re.escape(INVALID_OBJECT_NAME_CHARACTERS) + ']', '_', name)
\ No newline at end of file